@@ -1,8 +1,30 @@
+import sys
+
 __version__ = "0.3.0"
 __author__ = "Norman Juchler"
 
-from ._dicom_io import (copy_from_file,
-                        copy_from_list,
-                        copy_headers,
-                        create_dataset_summary,
-                        print_info)
+__all__ = ["copy_from_file",
+           "copy_from_list",
+           "copy_headers",
+           "create_dataset_summary",
+           "print_info"]
+
+# Importing _dicom_io pulls in pandas and pydicom. Defer this until one of
+# the functions is actually accessed, such that the command line tools stay
+# responsive (PEP 562, requires Python 3.7).
+if sys.version_info < (3, 7):
+    from ._dicom_io import (copy_from_file,
+                            copy_from_list,
+                            copy_headers,
+                            create_dataset_summary,
+                            print_info)
+else:
+    def __getattr__(name):
+        if name in __all__:
+            from . import _dicom_io
+            return getattr(_dicom_io, name)
+        raise AttributeError("module %r has no attribute %r"
+                             % (__name__, name))
+
+    def __dir__():
+        return sorted(list(globals()) + __all__)
@@ -1,15 +1,20 @@
+import os
+import csv
+import mmap
 import errno
 import shutil
 import logging
-import pandas as pd
 import pydicom as dicom
 from pathlib import Path
-from itertools import islice
+from itertools import islice, groupby
 from datetime import datetime
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from ._utils import (check_in_dir,
                      ensure_out_dir,
-                     create_progress_bar)
+                     glob_files,
+                     create_progress_bar,
+                     OptionalRegex)
 
 
 try:
@@ -19,15 +24,42 @@ except AttributeError:
 
 _NA = "N/A"
 _DICOM_SUFFIX = ".dcm"
+_PIXEL_DATA_TAG = dicom.tag.Tag(0x7FE0, 0x0010)
+# Tag of (FloatPixelData), the first of the pixel data elements.
+_FIRST_PIXEL_DATA_TAG = dicom.tag.Tag(0x7FE0, 0x0008)
+# Values larger than this are read from disk only when accessed. This keeps
+# the pixel data out of memory if only the header is needed.
+_DEFER_SIZE = "1 KB"
+_UNDEFINED_LENGTH = 0xFFFFFFFF
+# Columns of the summary table. The columns for the extra tags are
+# inserted in between the head and the tail columns.
+_SUMMARY_COLUMNS_HEAD = ("patientId", "caseId", "datetime", "datetimeType",
+                         "modality", "size", "spacing", "nFrames")
+_SUMMARY_COLUMNS_TAIL = ("studyInstanceUID", "seriesInstanceUID",
+                         "sopInstanceUID", "path")
+_SUMMARY_EXTRA_TAGS = ("RadiationSetting", "PositionerMotion",
+                       "BodyPartExamined", "StudyDescription",
+                       "SeriesDescription")
+# Tags read by create_dataset_summary(), in addition to the extra tags.
+_SUMMARY_TAGS = tuple(dicom.tag.Tag(keyword) for keyword in (
+    "PatientID", "Modality", "SOPInstanceUID", "StudyInstanceUID",
+    "SeriesInstanceUID", "Columns", "Rows", "PixelSpacing", "NumberOfFrames",
+    "AcquisitionDate", "AcquisitionTime", "StudyDate", "StudyTime",
+    "InstanceCreationDate", "InstanceCreationTime", "SeriesDate",
+    "SeriesTime"))
 _LOGGER_ID = "dicom"
 _logger = logging.getLogger(_LOGGER_ID)
 
 # Run static type checking with the following command:
 # mypy _utils.py --ignore-missing-imports --allow-redefinition
-from typing import TypeVar, Optional, Tuple, List, Callable, Any
+from typing import (TypeVar, Optional, Tuple, List, Callable, Any, Iterator,
+                    TYPE_CHECKING)
 # Protocol is part of the typing module in Python 3.8+,
 # but it remains available for older Python versions.
 from typing_extensions import Protocol
+if TYPE_CHECKING:
+    # pandas is slow to import, it is only loaded where needed.
+    import pandas as pd
 PathLike = TypeVar("PathLike", str, Path)
 OptionalPathList = Optional[List[Path]]
 OptionalFilter = Optional[Callable[[PathLike], bool]]
@@ -36,15 +68,119 @@ class CallablePrinter(Protocol):
 OptionalPrinter = Optional[CallablePrinter]
 
 
+def _read_header(path: PathLike,
+                 specific_tags: Optional[List[dicom.tag.BaseTag]]=None,
+                 ) -> dicom.Dataset:
+    """
+    Read a DICOM file without its pixel data. The file is memory-mapped,
+    such that the many small reads of the parser are served from the page
+    cache without further system calls. If specific_tags are provided,
+    all other data elements are skipped, and parsing stops after the
+    last of the specific tags.
+    """
+    last_tag = max(specific_tags) if specific_tags else _PIXEL_DATA_TAG
+    def _stop_when(tag: dicom.tag.BaseTag, vr: Optional[str],
+                   length: int) -> bool:
+        # Data elements are sorted by tag.
+        return tag > last_tag or tag >= _FIRST_PIXEL_DATA_TAG
+
+    with open(path, "rb") as fid:
+        if hasattr(os, "posix_fadvise"):
+            # Hint the kernel to read ahead.
+            os.posix_fadvise(fid.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        try:
+            mm = mmap.mmap(fid.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files cannot be mapped, let pydicom report the error.
+            return dicom.dcmread(fid, stop_before_pixels=True,
+                                 specific_tags=specific_tags)
+        with mm:
+            return dicom.filereader.read_partial(mm,
+                                                 stop_when=_stop_when,
+                                                 specific_tags=specific_tags)
+
+
+def _fast_copy(src: PathLike,
+               dst: PathLike,
+               copy_stat: bool=True) -> PathLike:
+    """
+    Copy a file like shutil.copy2(), or like shutil.copy() if copy_stat
+    is False. Where available (Linux), os.copy_file_range() is used,
+    which leaves the copy to the kernel or the file system. This permits
+    reflinks (Btrfs, XFS) and server-side copies (NFS 4.2, SMB).
+    """
+    if hasattr(os, "copy_file_range"):
+        n_total = 0
+        try:
+            with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+                # Copy until the end of the file is reached. Files in procfs
+                # or some FUSE file systems report a size of 0.
+                n_chunk = max(os.fstat(fsrc.fileno()).st_size, 2**23)
+                while True:
+                    n_copied = os.copy_file_range(fsrc.fileno(),
+                                                  fdst.fileno(),
+                                                  n_chunk)
+                    if n_copied == 0:
+                        break
+                    n_total += n_copied
+        except OSError:
+            # Not supported for this file (system), use the fallback. It
+            # raises the error again if the problem lies elsewhere. A
+            # partially copied file however must not be retried.
+            if n_total > 0:
+                raise
+        else:
+            if copy_stat:
+                shutil.copystat(src, dst)
+            else:
+                shutil.copymode(src, dst)
+            return dst
+    return shutil.copy2(src, dst) if copy_stat else shutil.copy(src, dst)
+
+
+def _read_list_column_arrow(list_file: Path,
+                            list_column: str) -> Optional[List[str]]:
+    """
+    Read a column of a .csv file with the multithreaded parser of pyarrow.
+    Returns None if pyarrow is not available, if the file may contain
+    comments (not supported by pyarrow) or if the column is missing.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.csv as pa_csv
+    except ImportError:
+        return None
+    with open(list_file, "rb") as fid:
+        try:
+            with mmap.mmap(fid.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if mm.find(b"#") >= 0:
+                    return None
+        except ValueError:
+            # Empty file.
+            return None
+    convert_options = pa_csv.ConvertOptions(
+        include_columns=[list_column],
+        column_types={list_column: pa.string()},
+        strings_can_be_null=False)
+    try:
+        table = pa_csv.read_csv(str(list_file),
+                                convert_options=convert_options)
+    except pa.ArrowException:
+        return None
+    return table.column(0).to_pylist()
+
+
 def copy_from_file(in_dir: PathLike,
                    out_dir: PathLike,
                    list_file: PathLike,
                    list_column: Optional[str]=None,
                    flat_copy: bool=False,
                    raise_if_missing: bool=True,
-                   show_progress: bool=True) -> OptionalPathList:
+                   show_progress: bool=True,
+                   n_jobs: Optional[int]=1) -> OptionalPathList:
     """
     Copy content from source_dir to out_dir as defined in the list_file.
+    See copy_from_list() for the remaining arguments.
     """
     list_file = Path(list_file)
     if not list_file.is_file():
@@ -52,21 +188,50 @@ def copy_from_file(in_dir: PathLike,
         return None
 
     if list_column is not None:
-        df = pd.read_csv(list_file, comment="#")
-        if list_column not in df:
-            _logger.error("List file misses a column named '%s'!", list_column)
-            return None
-        to_copy = df[list_column]
+        to_copy = _read_list_column_arrow(list_file, list_column)
+        if to_copy is None:
+            import pandas as pd
+            # Parse only the relevant column, keep the entries as strings.
+            df = pd.read_csv(list_file,
+                             usecols=lambda col: col == list_column,
+                             comment="#", engine="c", dtype=str,
+                             memory_map=True, na_filter=False)
+            if list_column not in df:
+                _logger.error("List file misses a column named '%s'!",
+                              list_column)
+                return None
+            to_copy = df[list_column].tolist()
+        # Skip empty entries.
+        to_copy = [entry for entry in to_copy if entry != ""]
     else:
-        df = pd.read_csv(list_file, comment="#", header=None)
-        # Pick first column
-        to_copy = df.iloc[:,0]
+        # Pick first column. A plain list does not need pandas.
+        with open(list_file, "r", encoding="utf-8-sig", newline="") as fid:
+            lines = (line.split("#", 1)[0] for line in fid)
+            to_copy = [row[0] for row in csv.reader(lines)
+                       if row and row[0].strip()]
     return copy_from_list(in_dir=in_dir,
                           out_dir=out_dir,
                           to_copy=to_copy,
                           flat_copy=flat_copy,
                           raise_if_missing=raise_if_missing,
-                          show_progress=show_progress)
+                          show_progress=show_progress,
+                          n_jobs=n_jobs)
+
+
+def _copy_entry(src: Path, dst: Path, raise_if_missing: bool) -> None:
+    # Copy directory robustly.
+    # Source: http://stackoverflow.com/questions/1994488/ (user tzot)
+    try:
+        shutil.copytree(src, dst, copy_function=_fast_copy)
+    except OSError as exc:
+        if exc.errno == errno.ENOTDIR:
+            _fast_copy(src, dst, copy_stat=False)
+        else:  # pragma no cover
+            if raise_if_missing:
+                _logger.error("Could not copy content %s.", src)
+                raise
+            else:
+                _logger.warning("Could not copy content %s.", src)
 
 
 def copy_from_list(in_dir: PathLike,
@@ -74,10 +239,14 @@ def copy_from_list(in_dir: PathLike,
                    to_copy: List[str],
                    flat_copy: bool=False,
                    raise_if_missing: bool=True,
-                   show_progress: bool=True) -> OptionalPathList:
+                   show_progress: bool=True,
+                   n_jobs: Optional[int]=1) -> OptionalPathList:
     """
     Note: This function is generic, it copies all files or folders specified
     in the input list, not just DICOMs.
+
+    The entries are copied by n_jobs threads, as copying is I/O bound.
+    Use n_jobs=None for the default of concurrent.futures.
     """
     in_dir = Path(in_dir)
     out_dir = Path(out_dir)
@@ -86,45 +255,55 @@ def copy_from_list(in_dir: PathLike,
     if not ensure_out_dir(out_dir):
         return None
 
-    n_files = len(to_copy)
-    _logger.info("Copying data...")
-    progress = create_progress_bar(size=n_files,
-                                   label="WORK",
-                                   enabled=show_progress)
-    progress.start()
-
-    entries_copied = []
-    for i, filename in enumerate(to_copy):
+    # Determine the copy jobs. Entries that exist already, that occur
+    # more than once in the list, or that lie inside a folder that is
+    # copied as a whole, are copied only once.
+    dsts = []
+    jobs = []
+    dsts_pending = set()
+    # Output folders that are known to exist. Avoids a mkdir/stat per entry
+    # if many entries share the same parent (always the case for flat_copy).
+    dirs_ensured = {out_dir}
+    for filename in to_copy:
         src = in_dir / filename
         if flat_copy:
             dst = out_dir / Path(filename).name
         else:
             dst = out_dir / filename
-
-        # Copy directory robustly.
-        # Source: http://stackoverflow.com/questions/1994488/ (user tzot)
-        ensure_out_dir(dst.parent, raise_error=True)
-        if not dst.exists():
-            _logger.info("Copying content: %s...", filename)
-            try:
-                shutil.copytree(src, dst)
-            except OSError as exc:
-                if exc.errno == errno.ENOTDIR:
-                    shutil.copy(src, dst)
-                else:  # pragma no cover
-                    if raise_if_missing:
-                        _logger.error("Could not copy content %s.", src)
-                        raise
-                    else:
-                        _logger.warning("Could not copy content %s.", src)
-        else:
+        # Don't create folders inside a pending copy target, copytree()
+        # requires that the target does not exist yet.
+        pending = (dst in dsts_pending or
+                   not dsts_pending.isdisjoint(dst.parents))
+        if not pending and dst.parent not in dirs_ensured:
+            ensure_out_dir(dst.parent, raise_error=True)
+            dirs_ensured.add(dst.parent)
+        if pending or dst.exists():
             _logger.info("Skipping existing content: %s...", filename)
+        else:
+            _logger.info("Copying content: %s...", filename)
+            dsts_pending.add(dst)
+            jobs.append((src, dst))
+        dsts.append(dst)
 
-        if dst.exists():
-            entries_copied.append(dst)
-
-        progress.update(i)
+    n_copies = len(jobs)
+    _logger.info("Copying data...")
+    progress = create_progress_bar(size=n_copies,
+                                   label="WORK",
+                                   enabled=show_progress)
+    progress.start()
+    args = ([src for src, _ in jobs],
+            [dst for _, dst in jobs],
+            [raise_if_missing]*n_copies)
+    if n_jobs is None or n_jobs > 1:
+        with ThreadPoolExecutor(max_workers=n_jobs) as executor:
+            for i, _ in enumerate(executor.map(_copy_entry, *args)):
+                progress.update(i+1)
+    else:
+        for i, _ in enumerate(map(_copy_entry, *args)):
+            progress.update(i+1)
     progress.finish()
+
+    entries_copied = [dst for dst in dsts if dst.exists()]
     _logger.info("Done!")
     _logger.info("Copied %d out of %d entries.",
                  len(entries_copied), len(to_copy))
@@ -132,13 +311,70 @@ def copy_from_list(in_dir: PathLike,
     return entries_copied
 
 
+def _is_up_to_date(out_file: Path, in_file: Path) -> bool:
+    try:
+        return out_file.stat().st_mtime >= in_file.stat().st_mtime
+    except FileNotFoundError:
+        return False
+
+
+def _copy_folder_headers(in_files: List[Path],
+                         out_files: List[Path],
+                         first_file_only: bool,
+                         skip_empty: bool,
+                         skip_existing: bool) -> Tuple[List[Path], int]:
+    """
+    Copy the headers of DICOM files that share the same output folder.
+    Returns the files created and the number of up-to-date files skipped.
+    """
+    files_created = []
+    n_skipped = 0
+    for filepath, out_file in zip(in_files, out_files):
+        if first_file_only and (files_created or n_skipped):
+            break
+        if skip_existing and _is_up_to_date(out_file, filepath):
+            _logger.debug("Skipping up-to-date header: %s", out_file)
+            n_skipped += 1
+            continue
+        dataset = dicom.dcmread(filepath, defer_size=_DEFER_SIZE)
+        # This fixes a problem for corrupted data sets.
+        has_pixel_data = _PIXEL_DATA_TAG in dataset
+        if not has_pixel_data and skip_empty:
+            continue
+        elif has_pixel_data:
+            # Reset pixel data.
+            del dataset.PixelData
+        else:
+            _logger.debug("No pixel data to remove: %s", filepath.stem)
+        if _PYDICOM_MAJOR_VERSION >= 3:
+            dataset.save_as(str(out_file),
+                            enforce_file_format=True)
+        else:
+            dataset.save_as(str(out_file),
+                            write_like_original=True)
+        files_created.append(out_file)
+    return files_created, n_skipped
+
+
 def copy_headers(in_dir: PathLike,
                  out_dir: PathLike,
                  glob_expr: str=f"**/*{_DICOM_SUFFIX}",
                  file_filter: OptionalFilter=None,
                  first_file_only: bool=True,
                  show_progress: bool=True,
-                 skip_empty: bool=True) -> OptionalPathList:
+                 skip_empty: bool=True,
+                 skip_existing: bool=False,
+                 n_jobs: Optional[int]=1) -> OptionalPathList:
+    """
+    Copy DICOM files without pixel data from in_dir to out_dir.
+
+    With skip_existing, headers that are at least as recent as their
+    source file are neither read nor written again. They are not part
+    of the returned list of created files.
+
+    The output folders are processed by n_jobs worker processes. Use
+    n_jobs=None to use all available CPUs.
+    """
     in_dir = Path(in_dir)
     out_dir = Path(out_dir)
     if not check_in_dir(in_dir):
@@ -148,7 +384,7 @@ def copy_headers(in_dir: PathLike,
 
     # Identify the files, can be slow
     _logger.info("Collecting DICOM files...")
-    dicom_files = sorted(in_dir.glob(glob_expr))
+    dicom_files = sorted(glob_files(in_dir, glob_expr))
     n_files = len(dicom_files)
 
     # Apply filter
@@ -159,50 +395,81 @@ def copy_headers(in_dir: PathLike,
         n_files = len(dicom_files)
         _logger.info("  - files after filtering:  %d", n_files)
 
-    # Copy action
-    files_created = []
+    # Group consecutive files with the same output folder.
     folders_created = set()
+    groups = []
+    out_files = (out_dir / f.relative_to(in_dir) for f in dicom_files)
+    for out_parent, group in groupby(zip(dicom_files, out_files),
+                                     key=lambda item: item[1].parent):
+        if not ensure_out_dir(out_parent):  # pragma no cover
+            continue
+        folders_created.add(out_parent)
+        groups.append(tuple(zip(*group)))
 
+    # Copy action
     _logger.info("Copying DICOM files...")
     progress = create_progress_bar(size=n_files,
                                    label="WORK",
                                    threaded=True,
                                    enabled=show_progress)
-    previous_parent = None
-    for i, filepath in enumerate(dicom_files):
-        progress.update(i)
-        out_file = out_dir / filepath.relative_to(in_dir)
-        out_parent = out_file.parent
-        if not ensure_out_dir(out_parent):  # pragma no cover
-            continue
-        folders_created.add(out_parent)
-        if first_file_only and out_parent==previous_parent:
-            continue
-        dataset = dicom.dcmread(filepath)
-        # This fixes a problem for corrupted data sets.
-        pixel_data_tag = dicom.tag.Tag("PixelData")
-        if not pixel_data_tag in dataset and skip_empty:
-            continue
-        elif pixel_data_tag in dataset:
-            # Reset pixel data.
-            del dataset.PixelData
-        else:
-            _logger.debug("No pixel data to remove: %s", filepath.stem)
-        if _PYDICOM_MAJOR_VERSION >= 3:
-            dataset.save_as(str(out_file),
-                            enforce_file_format=True)
-        else:
-            dataset.save_as(str(out_file),
-                            write_like_original=True)
-        files_created.append(out_file)
-        previous_parent = out_parent
+    n_groups = len(groups)
+    args = ([in_files for in_files, _ in groups],
+            [out_files for _, out_files in groups],
+            [first_file_only]*n_groups,
+            [skip_empty]*n_groups,
+            [skip_existing]*n_groups)
+    results = []
+    n_done = 0
+    if n_jobs is None or n_jobs > 1:
+        # Distribute the work in chunks to amortize the IPC overhead.
+        n_workers = n_jobs or os.cpu_count() or 1
+        chunksize = max(1, min(64, n_groups // (4*n_workers)))
+        with ProcessPoolExecutor(max_workers=n_workers) as executor:
+            # map() submits all work, which starts the worker processes.
+            # Start the timer thread of the progress bar only afterwards,
+            # workers must not be forked while another thread is running.
+            results_iter = executor.map(_copy_folder_headers, *args,
+                                        chunksize=chunksize)
+            progress.start()
+            for in_files, result in zip(args[0], results_iter):
+                results.append(result)
+                n_done += len(in_files)
+                progress.update(n_done)
+    else:
+        progress.start()
+        for in_files, result in zip(args[0],
+                                    map(_copy_folder_headers, *args)):
+            results.append(result)
+            n_done += len(in_files)
+            progress.update(n_done)
+    files_created = [f for created, _ in results for f in created]
+    n_skipped = sum(skipped for _, skipped in results)
     progress.finish()
     _logger.info("Done!")
     _logger.info("Created %d DICOM headers in %d folders.",
                  len(files_created), len(folders_created))
+    if n_skipped:
+        _logger.info("Skipped %d up-to-date DICOM headers.", n_skipped)
     return files_created
 
 
+def _pixel_data_size(dataset: dicom.Dataset) -> int:
+    """
+    Size of the pixel data in bytes. Takes the length of the raw element
+    if available, such that deferred pixel data is not loaded.
+    """
+    if _PYDICOM_MAJOR_VERSION >= 3:
+        elem = dataset.get_item(_PIXEL_DATA_TAG, keep_deferred=True)
+    else:
+        # Older versions load deferred values in get_item() anyway.
+        elem = dataset.get_item(_PIXEL_DATA_TAG)
+    length = getattr(elem, "length", _UNDEFINED_LENGTH)
+    if length == _UNDEFINED_LENGTH:
+        # Already converted element, or encapsulated pixel data.
+        length = len(dataset.PixelData)
+    return length
+
+
 def print_info(path: PathLike,
                printer: OptionalPrinter=None,
                detailed: bool=False) -> None:
@@ -213,14 +480,16 @@ def print_info(path: PathLike,
         _logger.info(msg)
     printer = default_printer if printer is None else printer
 
+    # The DICOM files in the folder of the input, listed only once.
+    dicom_files = None
     if path.is_dir():
-        files = list(sorted(path.glob(f"*{_DICOM_SUFFIX}")))
-        if not files:
+        dicom_files = list(glob_files(path, f"*{_DICOM_SUFFIX}"))
+        if not dicom_files:
             msg = "No DICOM files found under this location: %s"
             _logger.error(msg, path)
             return
-        # Pick first entry
-        path = files[0]
+        # Pick first entry, no need to sort all files for this.
+        path = min(dicom_files)
     if not path.exists():
         _logger.error("File or folder does not exist: %s", path)
         return
@@ -228,11 +497,12 @@ def print_info(path: PathLike,
         _logger.error("Expecting a DICOM file as input: %s", path)
         return
 
-    dataset = dicom.dcmread(path)
+    dataset = dicom.dcmread(path, defer_size=_DEFER_SIZE)
 
     if detailed:
         printer()
-        printer("Entire DICOM dictionary:\n" + str(dataset))
+        printer("Entire DICOM dictionary:")
+        printer(str(dataset))
 
     printer()
     printer("Filename.........: %s" % path.name)
@@ -246,94 +516,155 @@ def print_info(path: PathLike,
     printer("Modality.........: %s" % dataset.Modality)
     printer("Study date.......: %s" % dataset.StudyDate)
 
-    if "PixelData" in dataset:
+    if _PIXEL_DATA_TAG in dataset:
         rows = int(dataset.Rows)
         cols = int(dataset.Columns)
         printer("Image size.......: {rows:d} x {cols:d}, {size:d} bytes".format(
-                rows=rows, cols=cols, size=len(dataset.PixelData)))
+                rows=rows, cols=cols, size=_pixel_data_size(dataset)))
         if "PixelSpacing" in dataset:
             printer("Pixel spacing....: %s" % dataset.PixelSpacing)
 
     if "NumberOfFrames" in dataset:
        n_frames = int(dataset.NumberOfFrames)
     else:
-       dir_path = path if path.is_dir() else path.parent
-       n_frames = len(list(dir_path.glob(f"*{_DICOM_SUFFIX}")))
+       if dicom_files is None:
+           dicom_files = list(glob_files(path.parent, f"*{_DICOM_SUFFIX}"))
+       n_frames = len(dicom_files)
     printer("Number of frames.: %s" % n_frames)
     printer("Slice location...: %s" % dataset.get("SliceLocation", _NA))
     printer("Seq. description.: %s" % dataset.get("SequenceDescription", _NA))
 
 
+def _canonical_datetime(date: str, time:str) -> datetime:
+    if len(time.split(".")) > 1:
+        dt = datetime.strptime(date+time,"%Y%m%d%H%M%S.%f")
+    else:
+        dt = datetime.strptime(date+time,"%Y%m%d%H%M%S")
+    return dt
+
+
+def _extract_time(dataset: dicom.Dataset,
+                  dataset_id: str) -> Tuple[datetime, str]:
+    if "AcquisitionDate" in dataset and "AcquisitionTime" in dataset:
+        dt = _canonical_datetime(date=dataset.AcquisitionDate,
+                                 time=dataset.AcquisitionTime)
+        dt_type = "AcquisitionDateTime"
+    elif "StudyDate" in dataset and "StudyTime" in dataset:
+        dt = _canonical_datetime(date=dataset.StudyDate,
+                                 time=dataset.StudyTime)
+        dt_type = "StudyDateTime"
+    elif "InstanceCreationDate" in dataset and "InstanceCreationTime" in dataset:
+        dt = _canonical_datetime(date=dataset.InstanceCreationDate,
+                                 time=dataset.InstanceCreationTime)
+        dt_type = "InstanceCreationDateTime"
+    elif "SeriesDate" in dataset and "SeriesTime" in dataset:
+        dt = _canonical_datetime(date=dataset.SeriesDate,
+                                 time=dataset.SeriesTime)
+        dt_type = "SeriesDateTime"
+    else:
+        _logger.warning("No date tag for dataset: %s", dataset_id)
+        dt = datetime.utcfromtimestamp(0)
+        dt_type = _NA
+    return dt, dt_type
+
+
+def _extract_key(dataset: dicom.Dataset,
+                 dataset_id: str,
+                 key: str,
+                 default: Any=_NA,
+                 warn: bool=True) -> Any:
+    def _clean_string(s: str) -> str:
+        if not isinstance(s, str):
+            return s
+        return s.replace('\"',"").replace("\n","_").replace(";","_")
+    value = dataset.get(key, None)
+    if value is None:
+        if warn:  # pragma no cover
+            _logger.warning("Dataset has no tag '%s': %s",
+                            key, dataset_id)
+        value = default
+    if isinstance(value, str):
+        value = _clean_string(value)
+    return value
+
+
+def _extract_series_record(series_id: str,
+                           file_path: Path,
+                           n_files: int,
+                           extra_tags: List[str],
+                           specific_tags: List[dicom.tag.BaseTag],
+                           ) -> Tuple[Any, ...]:
+    """
+    Extract a row of the dataset summary from a file of a DICOM series.
+    The order of the values corresponds to the columns of the summary.
+    """
+    series_dir  = file_path.parent
+    assert(series_dir.name == series_id)
+
+    sid         = series_id
+    dcm         = _read_header(file_path, specific_tags)
+    patient_id  = dcm.PatientID
+    dt, dt_type = _extract_time(dcm, sid)
+    modality    = _extract_key(dcm, sid, "Modality",          _NA,  True)
+    sop_uid     = _extract_key(dcm, sid, "SOPInstanceUID",    _NA,  True)
+    study_uid   = _extract_key(dcm, sid, "StudyInstanceUID",  _NA,  True)
+    series_uid  = _extract_key(dcm, sid, "SeriesInstanceUID", _NA,  True)
+    cols        = _extract_key(dcm, sid, "Columns",           None, True)
+    rows        = _extract_key(dcm, sid, "Rows",              None, True)
+    size        = _NA if (cols==None or rows==None) else [cols, rows]
+    spacing     = _extract_key(dcm, sid, "PixelSpacing",      _NA,  False)
+    n_frames    = _extract_key(dcm, sid, "NumberOfFrames",    None, False)
+    extra_data  = [_extract_key(dcm, sid, tag, _NA, False)
+                   for tag in extra_tags]
+
+    if n_frames is None:
+        n_frames = n_files
+
+    # The caseId is filled in later. Path always comes last.
+    return (patient_id, None, dt, dt_type, modality,
+            size, spacing, n_frames,
+            *extra_data,
+            study_uid, series_uid, sop_uid, str(series_dir))
+
+
 def create_dataset_summary(in_dir: PathLike,
                            glob_expr: str=f"**/*{_DICOM_SUFFIX}",
                            n_series_max: Optional[int]=None,
                            show_progress: bool=True,
                            extra_tags: Optional[List[str]]=[],
-                           ) -> pd.DataFrame:
+                           n_jobs: Optional[int]=1,
+                           regex: OptionalRegex=None,
+                           ) -> "pd.DataFrame":
     """
     Recursively search for DICOM data in a folder and represent the data
     as a pandas DataFrame.
+
+    The files are selected with glob_expr and, optionally, a regex that
+    must match the file path relative to in_dir (see glob_files()).
+
+    The DICOM headers are read by n_jobs worker processes. Use n_jobs=None
+    to use all available CPUs.
     """
+    import pandas as pd
     in_dir = Path(in_dir)
 
-    def _canonical_datetime(date: str, time:str) -> datetime:
-        if len(time.split(".")) > 1:
-            dt = datetime.strptime(date+time,"%Y%m%d%H%M%S.%f")
-        else:
-            dt = datetime.strptime(date+time,"%Y%m%d%H%M%S")
-        return dt
-
-    def _extract_time(dataset: dicom.Dataset,
-                      dataset_id: str) -> Tuple[datetime, str]:
-        if "AcquisitionDate" in dataset and "AcquisitionTime" in dataset:
-            dt = _canonical_datetime(date=dataset.AcquisitionDate,
-                                     time=dataset.AcquisitionTime)
-            dt_type = "AcquisitionDateTime"
-        elif "StudyDate" in dataset and "StudyTime" in dataset:
-            dt = _canonical_datetime(date=dataset.StudyDate,
-                                     time=dataset.StudyTime)
-            dt_type = "StudyDateTime"
-        elif "InstanceCreationDate" in dataset and "InstanceCreationTime" in dataset:
-            dt = _canonical_datetime(date=dataset.InstanceCreationDate,
-                                     time=dataset.InstanceCreationTime)
-            dt_type = "InstanceCreationDateTime"
-        elif "SeriesDate" in dataset and "SeriesTime" in dataset:
-            dt = _canonical_datetime(date=dataset.SeriesDate,
-                                     time=dataset.SeriesTime)
-            dt_type = "SeriesDateTime"
-        else:
-            _logger.warning("No date tag for dataset: %s", dataset_id)
-            dt = datetime.utcfromtimestamp(0)
-            dt_type = _NA
-        return dt, dt_type
-
-    def _extract_key(dataset: dicom.Dataset,
-                     dataset_id: str,
-                     key: str,
-                     default: Any=_NA,
-                     warn: bool=True) -> Any:
-        def _clean_string(s: str) -> str:
-            if not isinstance(s, str):
-                return s
-            return s.replace('\"',"").replace("\n","_").replace(";","_")
-        value = dataset.get(key, None)
-        if value is None:
-            if warn:  # pragma no cover
-                _logger.warning("Dataset has no tag '%s': %s",
-                                key, dataset_id)
-            value = default
-        if isinstance(value, str):
-            value = _clean_string(value)
-        return value
-
     # Construct a dict that maps the series to the *first* DICOM file.
     # Assumption: DICOM series are located in distinct folders that
     # contain the files/DICOM instances.
-    files = list(sorted(in_dir.glob(glob_expr)))
     files_per_series = defaultdict(list)
-    for f in files:
+    for f in glob_files(in_dir, glob_expr, regex):
         series_id = f.parent.name
         files_per_series[series_id].append(f)
+    # Move the first file of a series to the front, and order the series
+    # by their first file. This is the same order as for a sorted list of
+    # all files, but only the (much fewer) series must be sorted.
+    for dicom_files in files_per_series.values():
+        first = min(dicom_files)
+        dicom_files.remove(first)
+        dicom_files.insert(0, first)
+    files_per_series = defaultdict(list,
+                                   sorted(files_per_series.items(),
+                                          key=lambda item: item[1][0]))
     if n_series_max and n_series_max > 0:
         # Take first n items.
         new_dict = dict(islice(files_per_series.items(),
@@ -347,74 +678,66 @@ def create_dataset_summary(in_dir: PathLike,
     n_files = sum(map(len, files_per_series.values()))
     n_series = len(files_per_series)
 
+    # Default extra columns, without duplicates. Don't modify the input.
+    def _col_fmt(s: str) -> str:
+        return s[0].lower() + s[1:] if s else s
+    base_columns = _SUMMARY_COLUMNS_HEAD + _SUMMARY_COLUMNS_TAIL
+    extra_tags = [tag for tag in dict.fromkeys([*(extra_tags or []),
+                                                *_SUMMARY_EXTRA_TAGS])
+                  if _col_fmt(tag) not in base_columns]
+    columns = (*_SUMMARY_COLUMNS_HEAD,
+               *map(_col_fmt, extra_tags),
+               *_SUMMARY_COLUMNS_TAIL)
+    # Read only the required data elements. Unknown keywords cannot
+    # be present in a dataset and are skipped.
+    extra_tag_ids = map(dicom.datadict.tag_for_keyword, extra_tags)
+    specific_tags = [*_SUMMARY_TAGS,
+                     *(tag for tag in extra_tag_ids if tag is not None)]
+
     _logger.info("Collecting data...")
     progress = create_progress_bar(size=n_series,
                                    label="WORK",
                                    threaded=True,
                                    enabled=show_progress)
-    progress.start()
-    data = []
-    for i, (series_id, dicom_files) in enumerate(files_per_series.items()):
-        # Always use the first file to extract data from.
-        # len(files)>0 is guaranteed.
-        file_path   = dicom_files[0]
-        series_dir  = file_path.parent
-        assert(series_dir.name == series_id)
-
-        sid         = series_id
-        dcm         = dicom.dcmread(file_path)
-        patient_id  = dcm.PatientID
-        dt, dt_type = _extract_time(dcm, sid)
-        modality    = _extract_key(dcm, sid, "Modality",          _NA,  True)
-        sop_uid     = _extract_key(dcm, sid, "SOPInstanceUID",    _NA,  True)
-        study_uid   = _extract_key(dcm, sid, "StudyInstanceUID",  _NA,  True)
-        series_uid  = _extract_key(dcm, sid, "SeriesInstanceUID", _NA,  True)
-        cols        = _extract_key(dcm, sid, "Columns",           None, True)
-        rows        = _extract_key(dcm, sid, "Rows",              None, True)
-        size        = _NA if (cols==None or rows==None) else [cols, rows]
-        spacing     = _extract_key(dcm, sid, "PixelSpacing",      _NA,  False)
-        n_frames    = _extract_key(dcm, sid, "NumberOfFrames",    None, False)
-        
-        # Default extra columns...
-        extra_tags.append("RadiationSetting")
-        extra_tags.append("PositionerMotion")
-        extra_tags.append("BodyPartExamined")
-        extra_tags.append("StudyDescription")
-        extra_tags.append("SeriesDescription")
-        
-        if extra_tags:
-            def _col_fmt(s: str) -> str:
-                return s[0].lower() + s[1:] if s else s
-            extra_data = {_col_fmt(col): _extract_key(dcm, sid, col, _NA, False)
-                          for col in extra_tags}
-
-        if n_frames is None:
-            n_frames = len(dicom_files)
-
-        # This forms the row of the resulting table
-        row = dict(patientId=patient_id,
-                   caseId=None,
-                   datetime=dt,
-                   datetimeType=dt_type,
-                   modality=modality,
-                   size=size,
-                   spacing=spacing,
-                   nFrames=n_frames)
-        if extra_tags:
-            row.update(extra_data)
-        
-        row["studyInstanceUID"] = study_uid
-        row["seriesInstanceUID"] = series_uid
-        row["sopInstanceUID"] = sop_uid
-        # Path always comes last.
-        row["path"] = str(series_dir)
-        
-        data.append(row)
-        progress.update(i)
-
-    data = pd.DataFrame(data)
-    data = data.sort_values(["patientId", "datetime"]).reset_index(drop=True)
-    data["caseId"] = data.groupby("patientId").cumcount()+1
+    # Always use the first file to extract data from.
+    # len(files)>0 is guaranteed.
+    args = (list(files_per_series.keys()),
+            [files[0] for files in files_per_series.values()],
+            [len(files) for files in files_per_series.values()],
+            [extra_tags]*n_series,
+            [specific_tags]*n_series)
+    # Collect the values column by column, such that the DataFrame can be
+    # created from the columns without transposing a list of records.
+    values = [[] for _ in columns]
+    def _collect(records: Iterator[Tuple[Any, ...]]) -> None:
+        for i, record in enumerate(records):
+            for column, value in zip(values, record):
+                column.append(value)
+            progress.update(i+1)
+    if n_jobs is None or n_jobs > 1:
+        # Distribute the work in chunks to amortize the IPC overhead.
+        n_workers = n_jobs or os.cpu_count() or 1
+        chunksize = max(1, min(64, n_series // (4*n_workers)))
+        with ProcessPoolExecutor(max_workers=n_workers) as executor:
+            # Start the progress bar only after map() has started the
+            # worker processes, see copy_headers().
+            records = executor.map(_extract_series_record, *args,
+                                   chunksize=chunksize)
+            progress.start()
+            _collect(records)
+    else:
+        progress.start()
+        _collect(map(_extract_series_record, *args))
+
+    # Without any series, keep the (object) dtype of an empty table.
+    data = pd.DataFrame(dict(zip(columns, values)),
+                        columns=columns,
+                        dtype=None if n_series else object)
+    data = data.sort_values(["patientId", "datetime"],
+                            kind="stable",
+                            ignore_index=True)
+    # The data is sorted already, no need to sort the groups again.
+    data["caseId"] = data.groupby("patientId", sort=False).cumcount()+1
     progress.finish()
     _logger.info("Done!")
     return data
@@ -1,3 +1,7 @@
+import os
+import re
+import sys
+import glob
 import logging
 from pathlib import Path
 import progressbar as pg # Package: progressbar2
@@ -7,8 +11,10 @@ _logger = logging.getLogger(LOGGER_ID)
 
 # Run static type checking with the following command:
 # mypy _utils.py --ignore-missing-imports --allow-redefinition
-from typing import TypeVar, Optional, List, Callable
+from typing import (TypeVar, Optional, List, Callable, Iterable, Iterator,
+                    Pattern, Union)
 PathLike = TypeVar("PathLike", str, Path)
+OptionalRegex = Optional[Union[str, Pattern]]
 OptionalPathList = Optional[List[Path]]
 OptionalFilter = Optional[Callable[[PathLike], bool]]
 
@@ -40,6 +46,125 @@ def ensure_out_dir(out_dir: PathLike, raise_error: bool=False) -> bool:
     return out_dir.is_dir()
 
 
+# Matches recursive glob expressions of the form "**/*<suffix>".
+_RECURSIVE_SUFFIX_GLOB = re.compile(r"^\*\*[/\\]\*([^*?\[/\\]*)$")
+
+
+def _is_literal_glob(glob_expr: str) -> bool:
+    return not any(c in glob_expr for c in "*?[")
+
+
+def _regex_literal_prefix(regex: Pattern) -> str:
+    """
+    Return the literal string that all matches of the regex must start
+    with. The result is conservative: an empty string means unknown.
+    """
+    pattern = regex.pattern
+    if regex.flags & (re.IGNORECASE | re.VERBOSE) or "|" in pattern:
+        return ""
+    if pattern.startswith("^"):
+        pattern = pattern[1:]
+    prefix = []
+    i = 0
+    while i < len(pattern):
+        c = pattern[i]
+        if c == "\\":
+            # Only escaped punctuation is literal, \d, \w, \1 etc. are not.
+            i += 1
+            c = pattern[i:i+1]
+            if not c or c.isalnum():
+                break
+        elif c in ".^$*+?{}[]()":
+            break
+        quantifier = pattern[i+1:i+2]
+        if quantifier in ("*", "?", "{"):
+            break
+        prefix.append(c)
+        if quantifier == "+":
+            break
+        i += 1
+    return "".join(prefix)
+
+
+def _walk_files(root: str,
+                suffix: str,
+                regex: Optional[Pattern]=None) -> Iterator[str]:
+    """
+    Recursively yield the files under root that end with suffix and
+    whose path relative to root (with separator "/") matches the regex.
+    The file type is taken from the cached directory entries, which saves
+    a stat() call per entry compared to Path.glob(). Folders that cannot
+    contain matches of the regex are not entered.
+    """
+    suffix = os.path.normcase(suffix)
+    prefix = _regex_literal_prefix(regex) if regex else ""
+    stack = [(root, "")]
+    while stack:
+        path, rel_path = stack.pop()
+        try:
+            entries = os.scandir(path)
+        except PermissionError:
+            continue
+        with entries:
+            for entry in entries:
+                rel_entry = rel_path + entry.name
+                if entry.is_dir(follow_symlinks=False):
+                    rel_entry += "/"
+                    if (rel_entry.startswith(prefix) or
+                            prefix.startswith(rel_entry)):
+                        stack.append((entry.path, rel_entry))
+                elif (os.path.normcase(entry.name).endswith(suffix)
+                      and (regex is None or regex.match(rel_entry))
+                      and entry.is_file()):
+                    yield entry.path
+
+
+def glob_files(in_dir: PathLike,
+               glob_expr: str,
+               regex: OptionalRegex=None) -> Iterable[Path]:
+    """
+    Lazily find the files under in_dir that match the glob expression.
+    If a regex is provided, the file paths relative to in_dir (with
+    separator "/") must also match the regex, see re.match().
+
+    Literal expressions (without wildcards) are resolved directly,
+    without setting up the globbing machinery. Expressions of the form
+    "**/*<suffix>" use a fast directory walk, other expressions are
+    resolved with glob.iglob(). As with Path.glob(), hidden files and
+    folders are matched as well.
+    """
+    in_dir = Path(in_dir)
+    regex = re.compile(regex) if regex is not None else None
+    if _is_literal_glob(glob_expr):
+        path = in_dir / glob_expr
+        files = [path] if path.is_file() else []
+        if regex:
+            rel_path = path.relative_to(in_dir).as_posix()
+            files = files if regex.match(rel_path) else []
+        return files
+    match = _RECURSIVE_SUFFIX_GLOB.match(glob_expr)
+    if match:
+        return map(Path, _walk_files(str(in_dir), match.group(1), regex))
+    if sys.version_info < (3, 11):
+        # glob.iglob() skips hidden files, include_hidden requires 3.11.
+        paths = in_dir.glob(glob_expr)
+        if regex:
+            paths = (path for path in paths
+                     if regex.match(path.relative_to(in_dir).as_posix()))
+        return paths
+    pattern = os.path.join(glob.escape(str(in_dir)), glob_expr)
+    paths = glob.iglob(pattern, recursive=True, include_hidden=True)
+    if regex:
+        # Match the relative path on the raw string, before creating
+        # Path objects for the (possibly many) candidates.
+        n_prefix = len(os.path.join(str(in_dir), ""))
+        def _regex_filter(path: str) -> bool:
+            rel_path = path[n_prefix:].replace(os.sep, "/")
+            return bool(regex.match(rel_path))
+        paths = filter(_regex_filter, paths)
+    return map(Path, paths)
+
+
 def create_progress_bar(size: Optional[int]=None,
                         label: str="Processing...",
                         threaded: bool=False,
@@ -59,6 +184,8 @@ def create_progress_bar(size: Optional[int]=None,
         widgets.append(")")
     else:
         widgets.append(pg.BouncingBar())
+    # Rendering is costly for large loops, update the display less often.
+    poll_interval = 0.1 if (size is not None and size>1e4) else 0.02
     ProgressBarType: pg.ProgressBar = pg.ProgressBar if enabled else pg.NullBar
     if threaded and enabled:
         from threading import Timer
@@ -67,10 +194,13 @@ def create_progress_bar(size: Optional[int]=None,
                 while not self.finished.wait(self.interval):
                     self.function(*self.args, **self.kwargs)
         class ThreadedProgressBar(ProgressBarType):
+            # The main thread only records the latest value, rendering
+            # is left to the timer thread. Assigning an int is atomic.
             def __init__(self, *args, **kwargs):
                 super().__init__(*args, **kwargs)
-                self.timer = RepeatTimer(interval=0.05,
-                                         function=self.update)
+                self._latest_value = None
+                self.timer = RepeatTimer(interval=max(0.05, poll_interval),
+                                         function=self._render)
                 try:
                     self.timer.daemon = True
                 except AttributeError:
@@ -79,6 +209,13 @@ def create_progress_bar(size: Optional[int]=None,
             def run(self):
                 while not self.finished.wait(self.interval):
                     self.function(*self.args, **self.kwargs)
+            def update(self, value=None, force=False, **kwargs):
+                if force or kwargs or not self.timer.is_alive():
+                    return super().update(value, force=force, **kwargs)
+                if value is not None:
+                    self._latest_value = value
+            def _render(self):
+                super().update(self._latest_value)
             def start(self, *args, **kwargs):
                 ret = super().start(*args, **kwargs)
                 self.timer.start()
@@ -90,7 +227,7 @@ def create_progress_bar(size: Optional[int]=None,
 
     progress = ProgressBarType(max_value=size,
                                widgets=widgets,
-                               poll_interval=0.02)
+                               poll_interval=poll_interval)
     return progress
 
 
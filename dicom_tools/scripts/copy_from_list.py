@@ -1,17 +1,18 @@
 #!/usr/bin/env python
-import logging
+import os
 import argparse
-from .._dicom_io import copy_from_file
 from .._utils import setup_logging
 
 
 def _run(args):
+    from .._dicom_io import copy_from_file
     setup_logging(verbosity=args.verbosity)
     copy_from_file(in_dir=args.in_dir,
                    out_dir=args.out_dir,
                    list_file=args.list_file,
                    list_column=args.list_column,
-                   flat_copy=args.flat_copy)
+                   flat_copy=args.flat_copy,
+                   n_jobs=args.jobs)
 
 
 def _parse_args():
@@ -32,6 +33,10 @@ def _parse_args():
                                     "parsed as a .csv file WITH header row."))
     parser_group.add_argument("--flat-copy", action="store_true",
                               help="Ignore subfolder hierarchy.")
+    parser_group.add_argument("-j", "--jobs", type=int,
+                              default=os.cpu_count(),
+                              help=("Number of threads to copy the content. "
+                                    "Default: number of CPUs"))
     parser_group.add_argument("-v", "--verbosity", action="count",
                               help="Increase verbosity.")
     parser_group.add_argument("-h", "--help", action="help",
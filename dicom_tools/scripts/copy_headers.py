@@ -1,12 +1,11 @@
 #!/usr/bin/env python
-import logging
+import os
 import argparse
-from .._dicom_io import copy_headers
 from .._utils import setup_logging
 
 
 def _run(args):
-    root = logging.getLogger()
+    from .._dicom_io import copy_headers
     setup_logging(verbosity=args.verbosity)
     ret = copy_headers(in_dir=args.in_dir,
                        out_dir=args.out_dir,
@@ -14,7 +13,9 @@ def _run(args):
                        file_filter=None,
                        first_file_only=not args.all,
                        show_progress=True,
-                       skip_empty=True)
+                       skip_empty=True,
+                       skip_existing=args.skip_existing,
+                       n_jobs=args.jobs)
 
 
 def _parse_args():
@@ -36,6 +37,14 @@ def _parse_args():
                               help=("Create a header for every DICOM instance "
                                     "in a series. By default, the header of "
                                     "only the first instance is copied."))
+    parser_group.add_argument("-j", "--jobs", type=int,
+                              default=os.cpu_count(),
+                              help=("Number of worker processes to copy the "
+                                    "headers. Default: number of CPUs"))
+    parser_group.add_argument("--skip-existing", action="store_true",
+                              help=("Skip existing headers that are newer "
+                                    "than their source file. By default, "
+                                    "existing headers are overwritten."))
     parser_group.set_defaults(func=_run)
     return parser.parse_args()
 
@@ -1,23 +1,60 @@
 #!/usr/bin/env python
+import os
+import re
 import logging
 import argparse
 from pathlib import Path
-from .._dicom_io import create_dataset_summary
 from .._utils import setup_logging, ensure_out_dir, LOGGER_ID
 
 _logger = logging.getLogger(LOGGER_ID)
+_FORMATS = ("csv", "parquet", "feather")
+
+
+def _regex(value):
+    # argparse reports a usage error only for ArgumentTypeError, ValueError
+    # and TypeError, but not for re.error.
+    try:
+        return re.compile(value)
+    except re.error as ex:
+        raise argparse.ArgumentTypeError("invalid regular expression "
+                                         "'%s': %s" % (value, ex))
+
+
+def _write_summary(data, outpath, fmt):
+    if fmt == "csv":
+        data.to_csv(outpath, index=False)
+        return
+    # Columns such as size, spacing or the extra tags may contain lists or
+    # DICOM values. Store them as strings, as they appear in the .csv.
+    data = data.copy()
+    for col in data.columns[data.dtypes == object]:
+        data[col] = data[col].map(lambda x: x if x is None or
+                                  isinstance(x, str) else str(x))
+    if fmt == "parquet":
+        data.to_parquet(outpath, index=False, compression="zstd")
+    elif fmt == "feather":
+        data.to_feather(outpath, compression="lz4")
+    else:
+        assert False, "Unknown format: %s" % fmt
 
 
 def _run(args):
-    root = logging.getLogger()
+    from .._dicom_io import create_dataset_summary
     setup_logging(verbosity=args.verbosity+1)
     data = create_dataset_summary(in_dir=args.in_dir,
+                                  glob_expr=args.glob,
+                                  regex=args.regex,
                                   n_series_max=args.n_max,
-                                  extra_tags=args.extra_tags)
+                                  extra_tags=args.extra_tags,
+                                  n_jobs=args.jobs)
     out_dir = Path(args.out_dir)
     if data is not None and ensure_out_dir(out_dir=out_dir):
-        outpath = out_dir / "dicom_summary.csv"
-        data.to_csv(outpath, index=False)
+        outpath = out_dir / ("dicom_summary.%s" % args.format)
+        try:
+            _write_summary(data=data, outpath=outpath, fmt=args.format)
+        except ImportError as ex:
+            _logger.error("Cannot write .%s files: %s", args.format, ex)
+            return
         _logger.info("Wrote summary to: %s", outpath)
         if args.verbosity > 0:
             _logger.info("Summary table:")
@@ -26,8 +63,9 @@ def _run(args):
 
 
 def _parse_args():
-    description = ("Recursively search for DICOM data in a folder and "
-                   "summarize the data in a .csv")
+    description = ("Recursively search for DICOM data in a folder and\n"
+                   "summarize the data per series in a .csv, .parquet or\n"
+                   ".feather file (see --format).")
     formatter = argparse.RawDescriptionHelpFormatter
     parser = argparse.ArgumentParser(description=description,
                                      add_help=False,
@@ -39,8 +77,26 @@ def _parse_args():
                               help="Output directory. Default: ./out")
     parser_group.add_argument("-v", "--verbosity", action="count", default=0,
                               help="Increase verbosity")
+    parser_group.add_argument("-g", "--glob", default="**/*.dcm",
+                              help=("Glob expression to select the DICOM "
+                                    "files. Default: '**/*.dcm'"))
+    parser_group.add_argument("-r", "--regex", default=None, type=_regex,
+                              help=("Regular expression that the file paths "
+                                    "relative to the input directory must "
+                                    "match (from the start, separator '/'). "
+                                    "Applied after --glob. Folders that "
+                                    "cannot match are not searched."))
+    parser_group.add_argument("-f", "--format", default="csv",
+                              choices=_FORMATS,
+                              help=("Output format. The binary formats "
+                                    "parquet and feather require the package "
+                                    "pyarrow. Default: csv"))
     parser_group.add_argument("-n", "--n-max", type=int, default=None,
                               help="Limit the number DICOM entries.")
+    parser_group.add_argument("-j", "--jobs", type=int,
+                              default=os.cpu_count(),
+                              help=("Number of worker processes to read the "
+                                    "DICOM headers. Default: number of CPUs"))
     parser_group.add_argument("-h", "--help", action="help",
                               help="Show this help text")
     # Provide list of optional dicom tags to include in the summary
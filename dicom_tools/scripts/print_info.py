@@ -1,12 +1,10 @@
 #!/usr/bin/env python
-import logging
 import argparse
-from .._dicom_io import print_info
 from .._utils import setup_logging
 
 
 def _run(args):
-    root = logging.getLogger()
+    from .._dicom_io import print_info
     setup_logging(verbosity=args.verbosity+1)
     print_info(path=args.in_file,
                detailed=args.all)
@@ -1,31 +1,64 @@
-import shutil
+import os
+import re
+import errno
 import logging
 import unittest
 import tempfile
+import threading
+import contextlib
+import multiprocessing
 import pandas as pd
+import pydicom as dicom
 from pathlib import Path
+from unittest import mock
+import dicom_tools._dicom_io as dicom_io
 from dicom_tools._dicom_io import (copy_from_list,
                                    copy_from_file,
                                    copy_headers,
                                    print_info,
                                    create_dataset_summary,
+                                   _fast_copy,
                                    _LOGGER_ID)
-from dicom_tools._utils import setup_logging
+from dicom_tools._utils import setup_logging, create_progress_bar
+
+# Numeric id of a dataset folder, e.g. "dataset1".
+_FILE_ID_RE = re.compile(r"([0-9]+)")
+
+
+def make_temp_dir(test_case: unittest.TestCase) -> Path:
+    # Removed after the test, also if setUp() fails later on.
+    temp_dir = tempfile.TemporaryDirectory()
+    test_case.addCleanup(temp_dir.cleanup)
+    return Path(temp_dir.name)
+
+
+@contextlib.contextmanager
+def record_timers_at_process_start():
+    # Collect the running timer threads (e.g. of a threaded progress bar)
+    # whenever a worker process is started. Forking while another thread
+    # is running may deadlock.
+    records = []
+    start = multiprocessing.process.BaseProcess.start
+    def _start(process):
+        records.append([t for t in threading.enumerate()
+                        if isinstance(t, threading.Timer)
+                        and not t.finished.is_set()])
+        return start(process)
+    with mock.patch.object(multiprocessing.process.BaseProcess,
+                           "start", _start):
+        yield records
 
 
 class TestCopyFromListBase(unittest.TestCase):
     def setUp(self):
-        self.in_dir = Path(tempfile.mkdtemp())
-        self.out_dir = Path(tempfile.mkdtemp())
+        self.in_dir = make_temp_dir(self)
+        self.out_dir = make_temp_dir(self)
         self.n_files = 10
-        for i in range(self.n_files):
-            path = self.in_dir / ("file%02d" % i)
-            path.touch()
-        self.test_files = [f.name for f in self.in_dir.glob("file*")]
-
-    def tearDown(self):
-        shutil.rmtree(self.in_dir)
-        shutil.rmtree(self.out_dir)
+        self.test_files = ["file%02d" % i for i in range(self.n_files)]
+        for filename in self.test_files:
+            # Cheaper than Path.touch(), which also updates the timestamps.
+            fd = os.open(self.in_dir / filename, os.O_CREAT|os.O_WRONLY, 0o644)
+            os.close(fd)
 
     def check_results(self, list_in, list_ret, out_dir=None):
         if out_dir is None:
@@ -73,6 +106,72 @@ class TestCopyFromList(TestCopyFromListBase):
         self.check_results(list_in=to_copy, list_ret=ret)
         self.assertEqual(len(cm.output), 2) # Show exactly two warnings.
 
+    def test_parallel_copy(self):
+        to_copy = self.test_files[::2].copy()
+        with self.assertLogs("dicom", level="WARNING") as cm:
+            ret = copy_from_list(in_dir=self.in_dir,
+                                 out_dir=self.out_dir,
+                                 to_copy=to_copy + ["imaginary-file"],
+                                 raise_if_missing=False,
+                                 show_progress=False,
+                                 n_jobs=4)
+        self.check_results(list_in=to_copy, list_ret=ret)
+        self.assertEqual(len(cm.output), 1)
+
+    def test_copy_folder_and_content(self):
+        # A file inside a folder that is copied as a whole.
+        sub_dir = self.in_dir / "folder"
+        sub_dir.mkdir()
+        (sub_dir / "file.dcm").touch()
+        to_copy = ["folder", "folder/file.dcm"]
+        for n_jobs in (1, 4):
+            with self.subTest(n_jobs=n_jobs):
+                out_dir = make_temp_dir(self)
+                ret = copy_from_list(in_dir=self.in_dir,
+                                     out_dir=out_dir,
+                                     to_copy=to_copy,
+                                     show_progress=False,
+                                     n_jobs=n_jobs)
+                self.assertListEqual(ret, [out_dir / f for f in to_copy])
+                self.assertTrue((out_dir / "folder").is_dir())
+                self.assertTrue((out_dir / "folder" / "file.dcm").is_file())
+
+
+class TestFastCopy(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = make_temp_dir(self)
+        self.src = self.temp_dir / "src.dcm"
+        self.dst = self.temp_dir / "dst.dcm"
+        self.data = bytes(range(256))*100
+        self.src.write_bytes(self.data)
+        os.utime(self.src, (1e9, 1e9))
+
+    def check_copy(self):
+        self.assertEqual(self.dst.read_bytes(), self.data)
+        self.assertEqual(self.dst.stat().st_mtime, 1e9)
+
+    def test_copy(self):
+        ret = _fast_copy(self.src, self.dst)
+        self.assertEqual(ret, self.dst)
+        self.check_copy()
+
+    def test_fallback(self):
+        error = OSError(errno.EPERM, "Operation not permitted")
+        with mock.patch.object(os, "copy_file_range", create=True,
+                               side_effect=error) as copy_file_range:
+            _fast_copy(self.src, self.dst)
+        copy_file_range.assert_called_once()
+        self.check_copy()
+
+    @unittest.skipUnless(hasattr(os, "copy_file_range"),
+                         "requires os.copy_file_range()")
+    def test_partial_copy(self):
+        error = OSError(errno.EIO, "Input/output error")
+        with mock.patch.object(os, "copy_file_range",
+                               side_effect=[100, error]), \
+             self.assertRaises(OSError):
+            _fast_copy(self.src, self.dst)
+
 
 class TestCopyFromFile(TestCopyFromListBase):
     def test_copy(self):
@@ -109,6 +208,23 @@ class TestCopyFromFile(TestCopyFromListBase):
                                  show_progress=False,)
             self.assertIsNone(ret)
 
+    def test_copy_csv_comments(self):
+        to_copy = self.test_files[::2].copy()
+        list_file = self.in_dir/"files_to_copy.csv"
+        with open(list_file, "w") as fid:
+            fid.write("# Comment line\n")
+            fid.write("Data,Paths\n")
+            for i, filename in enumerate(to_copy):
+                fid.write("%d,%s\n" % (i, filename))
+            fid.write("%d,# Comment\n" % len(to_copy))
+
+        ret = copy_from_file(in_dir=self.in_dir,
+                             out_dir=self.out_dir,
+                             list_file=list_file,
+                             list_column="Paths",
+                             show_progress=False,)
+        self.check_results(list_in=to_copy, list_ret=ret)
+
     def test_copy_flat(self):
         # In files:     <in_dir>/<file_name>
         # To copy spec: <in_dir_name>/<file_name>
@@ -162,10 +278,7 @@ class TestCopyFromFile(TestCopyFromListBase):
 class TestCopyDicomHeaders(unittest.TestCase):
     def setUp(self):
         self.in_dir = Path(__file__).parent / "data"
-        self.out_dir = Path(tempfile.mkdtemp())
-
-    def tearDown(self):
-        shutil.rmtree(self.out_dir)
+        self.out_dir = make_temp_dir(self)
 
     def test_copy_first_only(self):
         headers = copy_headers(in_dir=self.in_dir,
@@ -187,6 +300,43 @@ class TestCopyDicomHeaders(unittest.TestCase):
                                skip_empty=False)
         self.assertEqual(len(headers), 5)
 
+    def test_parallel(self):
+        for first_file_only, n_expected in [(True, 3), (False, 5)]:
+            with tempfile.TemporaryDirectory() as out_dir:
+                headers = copy_headers(in_dir=self.in_dir,
+                                       out_dir=out_dir,
+                                       first_file_only=first_file_only,
+                                       show_progress=False,
+                                       skip_empty=False,
+                                       n_jobs=2)
+                self.assertEqual(len(headers), n_expected)
+                self.assertTrue(all(f.is_file() for f in headers))
+
+    def test_parallel_progress(self):
+        with record_timers_at_process_start() as records:
+            headers = copy_headers(in_dir=self.in_dir,
+                                   out_dir=self.out_dir,
+                                   first_file_only=False,
+                                   show_progress=True,
+                                   skip_empty=False,
+                                   n_jobs=2)
+        self.assertEqual(len(headers), 5)
+        self.assertTrue(len(records)>0)
+        self.assertTrue(all(len(timers)==0 for timers in records))
+
+    def test_skip_existing(self):
+        kwargs = dict(in_dir=self.in_dir,
+                      out_dir=self.out_dir,
+                      first_file_only=False,
+                      show_progress=False,
+                      skip_empty=False)
+        headers = copy_headers(**kwargs, skip_existing=True)
+        self.assertEqual(len(headers), 5)
+        headers = copy_headers(**kwargs, skip_existing=True)
+        self.assertEqual(len(headers), 0)
+        headers = copy_headers(**kwargs, skip_existing=False)
+        self.assertEqual(len(headers), 5)
+
     def test_invalid_input(self):
         headers = copy_headers(in_dir="/some/invalid/input/directory",
                                out_dir=self.out_dir)
@@ -197,11 +347,10 @@ class TestCopyDicomHeaders(unittest.TestCase):
 
 
     def test_file_filter(self):
-        import re
         def file_filter(filepath):
-            ret = re.match(".*([0-9]+).*", filepath.parent.name)
+            ret = _FILE_ID_RE.search(filepath.parent.name)
             # Return files with odd ids.
-            return (ret and int(ret.group(1))%2!=0)
+            return bool(ret and int(ret.group(1)) & 1)
 
         headers = copy_headers(in_dir=self.in_dir,
                                out_dir=self.out_dir,
@@ -247,6 +396,15 @@ class TestPrintInfo(unittest.TestCase):
                 print(rec.getMessage())
             print_info(path=filepath, detailed=True)
 
+    def test_detailed(self):
+        # The entire dataset is passed to the printer at once.
+        filepath = min(self.path.glob("*.dcm"))
+        messages = []
+        print_info(path=filepath,
+                   printer=lambda msg=None: messages.append(msg),
+                   detailed=True)
+        self.assertIn(str(dicom.dcmread(filepath)), messages)
+
     def test_invalid_input(self):
         with self.assertLogs("dicom", level=logging.ERROR) as cm:
             print_info(path="this/is/some/invalid/path")
@@ -277,7 +435,6 @@ class TestCreateDatasetSummary(unittest.TestCase):
 
     def setUp(self):
         self.data_dir = Path(__file__).parent / "data"
-        self.out_dir = Path(tempfile.mkdtemp())
 
     def test_basic(self):
         summary = create_dataset_summary(in_dir=self.data_dir)
@@ -288,12 +445,36 @@ class TestCreateDatasetSummary(unittest.TestCase):
                                          n_series_max=2)
         self.assertEqual(len(summary), 2)
 
+    def test_parallel(self):
+        summary = create_dataset_summary(in_dir=self.data_dir,
+                                         show_progress=False)
+        summary_parallel = create_dataset_summary(in_dir=self.data_dir,
+                                                  show_progress=False,
+                                                  n_jobs=2)
+        pd.testing.assert_frame_equal(summary, summary_parallel)
+
+    def test_parallel_progress(self):
+        bars = []
+        def _create_progress_bar(*args, **kwargs):
+            bars.append(create_progress_bar(*args, **kwargs))
+            return bars[-1]
+        with record_timers_at_process_start() as records, \
+             mock.patch.object(dicom_io, "create_progress_bar",
+                               _create_progress_bar):
+            summary = create_dataset_summary(in_dir=self.data_dir,
+                                             show_progress=True,
+                                             n_jobs=2)
+        self.assertEqual(len(summary), 3)
+        self.assertTrue(len(records)>0)
+        self.assertTrue(all(len(timers)==0 for timers in records))
+        # The last update reports the number of processed series.
+        self.assertEqual(bars[0]._latest_value, len(summary))
+
 
 class TestExtendedCreateDatasetSummary(unittest.TestCase):
 
     def setUp(self):
         self.data_dir = Path(__file__).parent / "data"
-        self.out_dir = Path(tempfile.mkdtemp())
 
     def test_basic(self):
         summary = create_dataset_summary(in_dir=self.data_dir,
@@ -0,0 +1,114 @@
+import io
+import sys
+import pkgutil
+import logging
+import tempfile
+import subprocess
+import unittest
+import importlib
+import importlib.util
+import contextlib
+import pandas as pd
+from pathlib import Path
+from unittest import mock
+import dicom_tools.scripts
+from dicom_tools._dicom_io import create_dataset_summary
+from dicom_tools.scripts import create_inventory
+
+
+SCRIPT_NAMES = [info.name for info in
+                pkgutil.iter_modules(dicom_tools.scripts.__path__)]
+HAS_PYARROW = importlib.util.find_spec("pyarrow") is not None
+
+
+def run_script(module, *argv):
+    with mock.patch.object(sys, "argv", [module.__name__, *argv]):
+        args = module._parse_args()
+    args.func(args)
+
+
+class TestScripts(unittest.TestCase):
+    def test_import(self):
+        self.assertTrue(len(SCRIPT_NAMES)>0)
+        for name in SCRIPT_NAMES:
+            with self.subTest(script=name):
+                module = importlib.import_module("dicom_tools.scripts."+name)
+                self.assertTrue(callable(module.main))
+
+    def test_help(self):
+        # Constructs the argument parsers.
+        for name in SCRIPT_NAMES:
+            with self.subTest(script=name):
+                module = importlib.import_module("dicom_tools.scripts."+name)
+                argv = [name, "--help"]
+                with mock.patch.object(sys, "argv", argv), \
+                     contextlib.redirect_stdout(io.StringIO()) as out, \
+                     self.assertRaises(SystemExit) as cm:
+                    module._parse_args()
+                self.assertEqual(cm.exception.code, 0)
+                self.assertTrue(out.getvalue().startswith("usage:"))
+
+    def test_lazy_imports(self):
+        # The heavy dependencies must not be loaded before _run().
+        modules = ", ".join("dicom_tools.scripts."+name
+                            for name in SCRIPT_NAMES)
+        code = ("import sys, %s; "
+                "print(','.join(m for m in ('pandas', 'pydicom') "
+                "if m in sys.modules))" % modules)
+        ret = subprocess.run([sys.executable, "-c", code],
+                             stdout=subprocess.PIPE, check=True)
+        self.assertEqual(ret.stdout.decode().strip(), "")
+
+
+class TestCreateInventory(unittest.TestCase):
+    def setUp(self):
+        self.data_dir = Path(__file__).parent / "data"
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.out_dir = Path(temp_dir.name)
+
+    def run_inventory(self, fmt):
+        run_script(create_inventory,
+                   "-i", str(self.data_dir),
+                   "-o", str(self.out_dir),
+                   "-f", fmt, "-j", "1")
+        return self.out_dir / ("dicom_summary.%s" % fmt)
+
+    def test_invalid_regex(self):
+        with contextlib.redirect_stderr(io.StringIO()) as err, \
+             self.assertRaises(SystemExit) as cm:
+            run_script(create_inventory, "-i", str(self.data_dir), "-r", "(")
+        self.assertEqual(cm.exception.code, 2)
+        self.assertIn("invalid regular expression", err.getvalue())
+
+    @unittest.skipUnless(HAS_PYARROW, "requires pyarrow")
+    def test_binary_formats(self):
+        expected = create_dataset_summary(in_dir=self.data_dir,
+                                          show_progress=False)
+        # Lists and DICOM values are stored as strings.
+        for col in ["size", "spacing"]:
+            expected[col] = expected[col].map(str)
+        readers = {"parquet": pd.read_parquet, "feather": pd.read_feather}
+        for fmt, reader in readers.items():
+            with self.subTest(format=fmt):
+                data = reader(self.run_inventory(fmt))
+                pd.testing.assert_frame_equal(data, expected,
+                                              check_dtype=False)
+                self.assertIsInstance(data["size"][0], str)
+
+    def test_missing_pyarrow(self):
+        # Importing a module that maps to None raises an ImportError.
+        modules = {"pyarrow": None, "fastparquet": None}
+        for fmt in ["parquet", "feather"]:
+            with self.subTest(format=fmt), \
+                 mock.patch.dict(sys.modules, modules), \
+                 self.assertLogs("dicom", level=logging.ERROR) as cm:
+                outpath = self.run_inventory(fmt)
+            self.assertEqual(len(cm.output), 1)
+            message = cm.records[0].getMessage()
+            self.assertTrue(message.startswith("Cannot write .%s" % fmt))
+            self.assertFalse(outpath.exists())
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -1,25 +1,25 @@
-import time
+import os
+import re
 import logging
 import unittest
+import tempfile
 import progressbar as pg
+from pathlib import Path
 from dicom_tools._utils import (create_progress_bar,
-                                setup_logging)
+                                glob_files,
+                                setup_logging,
+                                _regex_literal_prefix)
 
 
 class TestCreateProgressbar(unittest.TestCase):
     def setUp(self):
         self.n_steps = 10
-        self.sleep = 0.02
-
-    def task(self, seconds):
-        time.sleep(seconds)
 
     def test_progressbar_basic(self):
         with create_progress_bar(size=self.n_steps,
                                  threaded=False) as progress:
             self.assertIsInstance(progress, pg.ProgressBar)
             for i in range(self.n_steps):
-                self.task(seconds=self.sleep)
                 progress.update(i)
 
     def test_progressbar_indefinite_length(self):
@@ -27,7 +27,6 @@ class TestCreateProgressbar(unittest.TestCase):
                                  threaded=False) as progress:
             self.assertIsInstance(progress, pg.ProgressBar)
             for i in range(self.n_steps):
-                self.task(seconds=self.sleep)
                 progress.update(i)
 
     def test_progressbar_threaded(self):
@@ -35,7 +34,105 @@ class TestCreateProgressbar(unittest.TestCase):
                                  threaded=True) as progress:
             self.assertIsInstance(progress, pg.ProgressBar)
             for i in range(self.n_steps):
-                self.task(seconds=self.sleep)
+                progress.update(i)
+        self.assertEqual(progress.value, self.n_steps)
+
+    def test_progressbar_threaded_render(self):
+        progress = create_progress_bar(size=self.n_steps, threaded=True)
+        progress.start()
+        self.addCleanup(progress.finish)
+        self.assertTrue(progress.timer.is_alive())
+        # The update is only recorded, the timer thread renders it.
+        progress.update(5)
+        self.assertEqual(progress._latest_value, 5)
+        progress._render()
+        self.assertEqual(progress.value, 5)
+        progress.update(7)
+        progress._render()
+        self.assertEqual(progress.value, 7)
+
+
+class TestGlobFiles(unittest.TestCase):
+    def setUp(self):
+        self.data_dir = Path(__file__).parent / "data"
+
+    def test_glob(self):
+        files = list(glob_files(self.data_dir, "**/*.dcm"))
+        self.assertEqual(len(files), 5)
+        files = list(glob_files(self.data_dir, "dataset2/*.dcm"))
+        self.assertEqual(len(files), 3)
+        files = list(glob_files(self.data_dir, "dataset[12]/*.dcm"))
+        self.assertEqual(len(files), 4)
+        files = list(glob_files(self.data_dir, "**/*"))
+        self.assertEqual(len(files), 5)
+        files = list(glob_files(self.data_dir, "**/*.txt"))
+        self.assertEqual(len(files), 0)
+
+    def test_literal(self):
+        expected = list(glob_files(self.data_dir, "dataset1/*.dcm"))[0]
+        glob_expr = str(expected.relative_to(self.data_dir))
+        files = list(glob_files(self.data_dir, glob_expr))
+        self.assertListEqual(files, [expected])
+        files = list(glob_files(self.data_dir, "dataset1/missing.dcm"))
+        self.assertListEqual(files, [])
+        # Directories are not matched.
+        files = list(glob_files(self.data_dir, "dataset1"))
+        self.assertListEqual(files, [])
+
+    def test_regex(self):
+        for glob_expr in ["**/*.dcm", "*/*.dcm"]:
+            files = list(glob_files(self.data_dir, glob_expr,
+                                    regex="dataset2/"))
+            self.assertEqual(len(files), 3)
+            files = list(glob_files(self.data_dir, glob_expr,
+                                    regex=re.compile(r"dataset[13]")))
+            self.assertEqual(len(files), 2)
+            files = list(glob_files(self.data_dir, glob_expr,
+                                    regex=r".*\.2\.dcm$"))
+            self.assertEqual(len(files), 1)
+
+    def test_regex_strategies(self):
+        # The directory walk ("**/*<suffix>") and glob.iglob() match the
+        # regex against the same relative paths.
+        in_dirs = [self.data_dir, os.path.relpath(self.data_dir)]
+        regexes = ["dataset2/", r"dataset[13]/", r".*\.2\.dcm$", "^d",
+                   "/", "data/"]
+        for in_dir in in_dirs:
+            for regex in regexes:
+                with self.subTest(in_dir=in_dir, regex=regex):
+                    walked = sorted(glob_files(in_dir, "**/*.dcm", regex))
+                    globbed = sorted(glob_files(in_dir, "**/*.dc[m]", regex))
+                    self.assertListEqual(walked, globbed)
+
+    def test_hidden(self):
+        # All strategies match hidden files and folders, like Path.glob().
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        in_dir = Path(temp_dir.name)
+        files = ["a.dcm", ".b.dcm", "sub/c.dcm", ".hidden/d.dcm",
+                 ".hidden/.e.dcm"]
+        for filename in files:
+            (in_dir / filename).parent.mkdir(exist_ok=True)
+            (in_dir / filename).touch()
+        expected = sorted(in_dir / filename for filename in files)
+        for glob_expr in ["**/*.dcm", "**/*.dc[m]"]:
+            with self.subTest(glob_expr=glob_expr):
+                found = sorted(glob_files(in_dir, glob_expr))
+                self.assertListEqual(found, expected)
+        found = list(glob_files(in_dir, ".hidden/.e.dcm"))
+        self.assertListEqual(found, [in_dir / ".hidden/.e.dcm"])
+
+    def test_regex_literal_prefix(self):
+        expected = {"^dataset2/": "dataset2/",
+                    r"dataset\d": "dataset",
+                    r"a\.b?c": "a.",
+                    "ab+c": "ab",
+                    "ab|cd": "",
+                    "(?i)abc": "",
+                    ".*abc": ""}
+        for pattern, prefix in expected.items():
+            self.assertEqual(_regex_literal_prefix(re.compile(pattern)),
+                             prefix)
 
 
 class TestSetupLogging(unittest.TestCase):
@@ -43,6 +140,20 @@ class TestSetupLogging(unittest.TestCase):
     def setUp(self):
         self.logger_id = "test.logger"
         self.logger = logging.getLogger(self.logger_id)
+        # setup_logging() modifies global state, restore it afterwards.
+        self.levels = {name: logging.getLogger(name).level
+                       for name in (self.logger_id, "pydicom")}
+        self.root_handlers = list(logging.getLogger().handlers)
+
+    def tearDown(self):
+        for name, level in self.levels.items():
+            logging.getLogger(name).setLevel(level)
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            if handler not in self.root_handlers:
+                root.removeHandler(handler)
+        self.logger.handlers.clear()
+        self.logger.propagate = True
 
     def assert_log_level(self, level):
         LEVELS = [logging.DEBUG,